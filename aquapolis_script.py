@@ -1,44 +1,406 @@
 import os
+import sys
 import time
 import json
 import re
 import logging
+import hashlib
+import queue
+import threading
+import importlib.util
+import multiprocessing
 import concurrent.futures
-from urllib.parse import urljoin, urlparse
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-
-# Selenium imports
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log", encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+from urllib.parse import urljoin
+
+from records import Product, to_json
+
+# Тяжелые зависимости (requests, bs4, pandas, selenium) импортируются там, где нужны,
+# чтобы модуль быстро загружался из CLI и в процессах-обработчиках.
+
 logger = logging.getLogger(__name__)
 
+
+def setup_logging():
+    """Настройка логирования"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("scraper.log", encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+
+# lxml заметно быстрее встроенного html.parser, используем его при наличии
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+
+def make_soup(content, encoding=None):
+    """BeautifulSoup из байтов страницы"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(content, HTML_PARSER, from_encoding=encoding)
+
+
+def response_encoding(response):
+    """Кодировка из заголовка Content-Type (иначе BeautifulSoup определит сам)"""
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    return None
+
+
+def parse_product_card(card, base_url, category=None):
+    """Парсинг карточки товара из HTML"""
+    try:
+        # Название
+        name_tag = card.find(['a', 'div', 'h3', 'h4'], class_=re.compile(r'name|title|header', re.I))
+        if not name_tag:
+            name_tag = card.find('a')
+        
+        if not name_tag:
+            return None
+
+        product = Product(name_tag.get_text(strip=True), category=category)
+        if name_tag.name == 'a':
+            product.url = urljoin(base_url, name_tag['href'])
+        elif name_tag.find('a'):
+            product.url = urljoin(base_url, name_tag.find('a')['href'])
+        
+        if not product.name:
+            return None
+
+        # Цена
+        price_tag = card.find(class_=re.compile(r'price|cost|sum', re.I))
+        if price_tag:
+            price_text = price_tag.get_text(strip=True)
+            price_match = re.search(r'(\d[\d\s]*[.,]?\d*)', price_text)
+            if price_match:
+                product.price = price_match.group(1).replace(' ', '').replace('\xa0', '')
+        
+        # Картинка
+        img_tag = card.find('img')
+        if img_tag:
+            src = img_tag.get('src') or img_tag.get('data-src') or img_tag.get('data-original')
+            if src:
+                product.image = urljoin(base_url, src)
+        
+        # Наличие
+        stock_tag = card.find(class_=re.compile(r'stock|availability', re.I))
+        if stock_tag:
+            product.in_stock = sys.intern(stock_tag.get_text(strip=True))
+        else:
+            product.in_stock = 'Уточняйте'
+
+        return product
+    except Exception as e:
+        return None
+
+
+def parse_product_details(soup):
+    """Парсинг страницы товара: артикул и таблица характеристик"""
+    details = {}
+
+    # Артикул
+    article_tag = soup.find(attrs={'itemprop': 'sku'})
+    if not article_tag:
+        article_tag = soup.find(class_=re.compile(r'sku|article|artikul|product-code', re.I))
+    if article_tag:
+        article_text = article_tag.get('content') or article_tag.get_text(' ', strip=True)
+    else:
+        label = soup.find(string=re.compile(r'Артикул', re.I))
+        article_text = label.parent.get_text(' ', strip=True) if label else ''
+
+    article = re.sub(r'^\s*(?:Артикул|Код товара|SKU)\s*[:№#]?\s*', '', article_text, flags=re.I).strip()
+    if article:
+        details['article'] = article
+
+    # Характеристики
+    specs = {}
+    spec_tables = soup.find_all('table', class_=re.compile(r'spec|char|attr|prop|param|data-table|additional', re.I))
+    if not spec_tables:
+        spec_tables = soup.find_all('table')
+
+    for table in spec_tables:
+        for row in table.find_all('tr'):
+            cells = row.find_all(['th', 'td'])
+            if len(cells) >= 2:
+                key = cells[0].get_text(' ', strip=True).rstrip(':')
+                value = cells[1].get_text(' ', strip=True)
+                if key and value:
+                    specs[key] = value
+
+    # Запасной вариант: списки определений
+    if not specs:
+        for dl in soup.find_all('dl'):
+            for dt in dl.find_all('dt'):
+                dd = dt.find_next_sibling('dd')
+                if dd:
+                    key = dt.get_text(' ', strip=True).rstrip(':')
+                    value = dd.get_text(' ', strip=True)
+                    if key and value:
+                        specs[key] = value
+
+    if specs:
+        details['specs'] = specs
+
+    return details
+
+
+def parse_listing_page(content, encoding, base_url, category_name):
+    """Разбор страницы категории: (товары, есть ли следующая страница)"""
+    soup = make_soup(content, encoding)
+
+    # Поиск карточек товаров
+    product_cards = soup.find_all(class_=re.compile(r'product-item|catalog-item|item-card|products-grid__item', re.I))
+
+    # Если не нашли по классам, ищем по структуре
+    if not product_cards:
+        for div in soup.find_all('div'):
+            if div.find('img') and div.find(string=re.compile(r'\d+\s*(?:руб|₽)')):
+                product_cards.append(div)
+
+    products = []
+    for card in product_cards:
+        product = parse_product_card(card, base_url, category_name)
+        if product:
+            products.append(product)
+
+    # Проверка пагинации
+    next_link = soup.find('a', class_=re.compile(r'next|forward'), href=True)
+    pagination = soup.find(class_=re.compile(r'pagination|pager'))
+
+    return products, bool(next_link or pagination)
+
+
+def parse_detail_page(content, encoding):
+    """Разбор страницы товара"""
+    return parse_product_details(make_soup(content, encoding))
+
+
+def _timed(func, *args):
+    """Выполнение func в процессе-обработчике с замером времени"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class StageStats:
+    """Счетчики пропускной способности одной стадии конвейера"""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.items = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.errors = 0
+
+    def add(self, elapsed, size=0):
+        with self.lock:
+            self.items += 1
+            self.bytes += size
+            self.busy += elapsed
+
+    def error(self):
+        with self.lock:
+            self.errors += 1
+
+    def summary(self, wall_time):
+        rate = self.items / wall_time if wall_time else 0
+        concurrency = self.busy / wall_time if wall_time else 0
+        return (
+            f"{self.name}: {self.items} стр. ({rate:.1f}/сек), "
+            f"{self.bytes / (1024 * 1024):.1f} MB, "
+            f"в среднем занято {concurrency:.1f} обработчиков, ошибок {self.errors}"
+        )
+
+
+class ParseStage:
+    """Стадия разбора: очередь скачанных страниц -> пул процессов -> поток обработки результатов.
+
+    Потоки загрузки только кладут страницу в очередь (ожидая, лишь если она заполнена)
+    и сразу идут за следующей. Результат разбора передается в on_result из отдельного потока.
+    В памяти между стадиями одновременно не больше queue_size + workers страниц.
+    """
+
+    def __init__(self, workers, queue_size, stats):
+        self.workers = workers
+        self.stats = stats
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.results = queue.Queue()
+        # Сколько страниц отдано в пул одновременно (остальные ждут в jobs)
+        self.in_flight = threading.BoundedSemaphore(max(workers, 1))
+        self.pool = None
+        self.dispatcher = None
+        self.handler = None
+
+    def start(self):
+        if self.workers > 0:
+            # spawn: к моменту первого submit уже работают потоки загрузки,
+            # а fork многопоточного процесса может зависнуть на их блокировках
+            self.pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.handler = threading.Thread(target=self._handle_results, daemon=True)
+        self.dispatcher.start()
+        self.handler.start()
+
+    def submit(self, stage, func, content, args, on_result, on_error):
+        """Постановка страницы в очередь разбора"""
+        self.jobs.put((stage, func, content, args, on_result, on_error))
+
+    def join(self):
+        """Ожидание разбора и обработки всех поставленных страниц"""
+        self.jobs.join()
+
+    def stop(self):
+        if self.dispatcher is None:
+            return
+        self.jobs.put(None)
+        self.dispatcher.join()
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+        self.results.put(None)
+        self.handler.join()
+        self.dispatcher = self.handler = None
+
+    def _dispatch(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+
+            stage, func, content, args, on_result, on_error = job
+            # Дальше нужен только размер страницы - сами байты не держим до обработки результата
+            meta = (stage, len(content), on_result, on_error)
+
+            if self.pool is None:
+                try:
+                    outcome = _timed(func, content, *args)
+                except Exception as e:
+                    outcome = e
+                self.results.put((meta, outcome))
+                continue
+
+            self.in_flight.acquire()
+            try:
+                future = self.pool.submit(_timed, func, content, *args)
+            except Exception as e:
+                # Процесс пула упал (BrokenProcessPool): страница завершается через on_error,
+                # остальные разбираются в этом потоке, чтобы обход не зависал
+                self.in_flight.release()
+                self.results.put((meta, e))
+                logger.error(f"❌ Пул разбора недоступен ({e}), дальше разбор без пула")
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+                continue
+            future.add_done_callback(lambda f, meta=meta: self._collect(meta, f))
+
+    def _collect(self, meta, future):
+        # Вызывается потоком пула: только передаем результат дальше, без долгой работы
+        self.in_flight.release()
+        try:
+            outcome = future.result()
+        except BaseException as e:
+            outcome = e
+        self.results.put((meta, outcome))
+
+    def _handle_results(self):
+        while True:
+            item = self.results.get()
+            if item is None:
+                return
+
+            (stage, size, on_result, on_error), outcome = item
+            try:
+                if isinstance(outcome, BaseException):
+                    self.stats[stage].error()
+                    on_error(outcome)
+                else:
+                    result, elapsed = outcome
+                    self.stats[stage].add(elapsed, size)
+                    on_result(result)
+            except Exception as e:
+                logger.error(f"❌ Ошибка обработки результата разбора: {e}")
+            finally:
+                self.jobs.task_done()
+
+
+# Как и раньше: после 51-й страницы категория не обходится
+MAX_CATEGORY_PAGES = 51
+
+
+class CategoryCrawl:
+    """Состояние обхода одной категории.
+
+    Страницы разбираются не по порядку, поэтому товары принимаются последовательно:
+    страница N засчитывается, только если все предыдущие подтвердили, что есть следующая.
+    """
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.products = []
+        self.results = {}     # page -> ((товары, есть ли следующая), предупреждение), ждут предыдущих страниц
+        self.released = 0     # последняя засчитанная страница
+        self.next_page = 1    # следующая страница для загрузки
+        self.done = False
+
+    def page_url(self, page):
+        return f"{self.url}?p={page}" if page > 1 else self.url
+
+
 class AquapolisOptimizedScraper:
-    def __init__(self, headless=True, max_workers=3):
+    def __init__(self, headless=True, max_workers=3, fetch_details=False, detail_workers=4, detail_queue_size=200,
+                 parse_workers=None, parse_queue_size=None):
+        # Без потоков загрузки обход категорий никогда не завершится
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        # Без потоков обогащения ограниченная очередь заполнится и остановит обход
+        if fetch_details and detail_workers < 1:
+            raise ValueError(f"detail_workers must be at least 1 when fetch_details is on, got {detail_workers}")
+
         self.base_url = "https://aquapolis.ru"
         self.headless = headless
         self.max_workers = max_workers
+
+        import requests
         self.session = requests.Session()
         self.driver = None
         self.categories = {}
         self.all_products = []
         self.output_dir = 'aquapolis_data'
+
+        # Конвейер: потоки только скачивают страницы, разбор идет в пуле процессов.
+        # parse_workers=0 - разбор в отдельном потоке, без пула.
+        self.parse_workers = (os.cpu_count() or 1) if parse_workers is None else parse_workers
+        self.parse_queue_size = parse_queue_size or max(self.parse_workers, 1) * 2
+        self.stage_stats = {
+            'fetch': StageStats('Загрузка'),
+            'parse': StageStats('Разбор листингов'),
+            'detail': StageStats('Разбор карточек'),
+        }
+        self.parse_stage = ParseStage(self.parse_workers, self.parse_queue_size, self.stage_stats)
+
+        # Очередь страниц категорий для потоков загрузки
+        self.page_queue = queue.Queue()
+        self.pages_lock = threading.Condition()
+        self.pages_pending = 0
+
+        # Стадия обогащения карточек (страницы товаров)
+        self.fetch_details = fetch_details
+        self.detail_workers = detail_workers
+        self.detail_queue = queue.Queue(maxsize=detail_queue_size)
+        self.detail_lock = threading.Lock()
+        self.detail_targets = {}   # url -> товары, ожидающие данных со страницы
+        self.detail_results = {}   # url -> уже полученные данные
+        self.detail_cache = {}     # url -> {etag, last_modified, hash, details}
+        self.detail_cache_path = os.path.join(self.output_dir, 'detail_cache.json')
+        self.detail_stats = {'fetched': 0, 'cached': 0, 'failed': 0}
         
         # Headers mimicking a real browser
         self.headers = {
@@ -51,6 +413,11 @@ class AquapolisOptimizedScraper:
 
     def setup_selenium(self):
         """Инициализация Selenium для обхода защиты и получения cookies"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+
         logger.info("🔧 Запуск Selenium для инициализации сессии...")
         options = Options()
         if self.headless:
@@ -87,18 +454,30 @@ class AquapolisOptimizedScraper:
             logger.error(f"❌ Ошибка Selenium: {e}")
             raise e
 
-    def get_soup(self, url):
-        """Получение BeautifulSoup объекта страницы через requests"""
+    def fetch(self, url, headers=None):
+        """Загрузка страницы через requests (только I/O, без разбора)"""
+        start = time.perf_counter()
         try:
-            response = self.session.get(url, timeout=15)
-            if response.status_code == 200:
-                return BeautifulSoup(response.text, 'html.parser')
-            else:
-                logger.warning(f"⚠ Ошибка запроса {url}: Status {response.status_code}")
-                return None
+            response = self.session.get(url, headers=headers, timeout=15)
         except Exception as e:
+            self.stage_stats['fetch'].error()
             logger.error(f"❌ Ошибка загрузки {url}: {e}")
             return None
+        if response.status_code in (200, 304):
+            self.stage_stats['fetch'].add(time.perf_counter() - start, len(response.content))
+        else:
+            self.stage_stats['fetch'].error()
+        return response
+
+    def get_soup(self, url):
+        """Получение BeautifulSoup объекта страницы через requests"""
+        response = self.fetch(url)
+        if response is None:
+            return None
+        if response.status_code != 200:
+            logger.warning(f"⚠ Ошибка запроса {url}: Status {response.status_code}")
+            return None
+        return make_soup(response.content, response_encoding(response))
 
     def parse_sitemap(self):
         """Сбор категорий с карты сайта или меню"""
@@ -144,111 +523,284 @@ class AquapolisOptimizedScraper:
         logger.info(f"📊 Найдено {count} потенциальных категорий.")
         return count > 0
 
-    def parse_product_card(self, card):
-        """Парсинг карточки товара из HTML"""
+    def fetch_product_details(self, url):
+        """Загрузка страницы товара с учетом кеша (ETag / Last-Modified / хеш содержимого).
+
+        Разбор уходит в стадию разбора, данные попадают в товары из apply_details.
+        """
+        with self.detail_lock:
+            cached = self.detail_cache.get(url)
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.fetch(url, headers=headers)
+        if response is None:
+            self._count_detail('failed')
+            self.apply_details(url, {})
+            return
+
+        if response.status_code == 304 and cached:
+            self._count_detail('cached')
+            self.apply_details(url, cached['details'])
+            return
+
+        if response.status_code != 200:
+            logger.warning(f"⚠ Ошибка запроса {url}: Status {response.status_code}")
+            self._count_detail('failed')
+            self.apply_details(url, {})
+            return
+
+        # Страница не изменилась с прошлого запуска - не парсим повторно
+        content_hash = hashlib.sha1(response.content).hexdigest()
+        if cached and cached.get('hash') == content_hash:
+            self._count_detail('cached')
+            self.apply_details(url, cached['details'])
+            return
+
+        cache_entry = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'hash': content_hash
+        }
+        self.parse_stage.submit(
+            'detail', parse_detail_page, response.content, (response_encoding(response),),
+            on_result=lambda details: self.store_details(url, cache_entry, details),
+            on_error=lambda error: self.detail_failed(url, error)
+        )
+
+    def store_details(self, url, cache_entry, details):
+        cache_entry['details'] = details
+        with self.detail_lock:
+            self.detail_cache[url] = cache_entry
+        self._count_detail('fetched')
+        self.apply_details(url, details)
+
+    def detail_failed(self, url, error):
+        logger.error(f"❌ Ошибка разбора {url}: {error}")
+        self._count_detail('failed')
+        self.apply_details(url, {})
+
+    def apply_details(self, url, details):
+        """Данные страницы товара -> все товары с этим URL"""
+        with self.detail_lock:
+            self.detail_results[url] = details
+            for product in self.detail_targets.pop(url, []):
+                product.update(details)
+
+    def _count_detail(self, key):
+        with self.detail_lock:
+            self.detail_stats[key] += 1
+
+    def enqueue_detail(self, product):
+        """Постановка товара в очередь обогащения (без дублей по URL)"""
+        url = product.url
+        if not self.fetch_details or not url:
+            return
+
+        with self.detail_lock:
+            if url in self.detail_results:
+                product.update(self.detail_results[url])
+                return
+            if url in self.detail_targets:
+                self.detail_targets[url].append(product)
+                return
+            self.detail_targets[url] = [product]
+
+        # Очередь ограничена: если обогащение отстает, обход листингов притормаживает
+        self.detail_queue.put(url)
+
+    def detail_worker(self):
+        """Поток обогащения: забирает URL из очереди, пока не получит None"""
+        while True:
+            url = self.detail_queue.get()
+            try:
+                if url is None:
+                    return
+                self.fetch_product_details(url)
+            except Exception as e:
+                logger.error(f"❌ Ошибка обогащения {url}: {e}")
+                self.apply_details(url, {})
+            finally:
+                self.detail_queue.task_done()
+
+    def start_detail_workers(self):
+        """Запуск потоков обогащения параллельно с обходом категорий"""
+        self.load_detail_cache()
+        logger.info(f"🔎 Запуск обогащения карточек в {self.detail_workers} поток(ов)...")
+        threads = []
+        for _ in range(self.detail_workers):
+            thread = threading.Thread(target=self.detail_worker, daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def stop_detail_workers(self, threads):
+        """Дожидаемся обработки очереди и останавливаем потоки"""
+        for _ in threads:
+            self.detail_queue.put(None)
+        for thread in threads:
+            thread.join()
+
+        # Страницы товаров, еще не прошедшие разбор
+        self.parse_stage.join()
+
+        self.save_detail_cache()
+        stats = self.detail_stats
+        logger.info(
+            f"🔎 Обогащение завершено: загружено {stats['fetched']}, "
+            f"без изменений {stats['cached']}, ошибок {stats['failed']}"
+        )
+
+    def load_detail_cache(self):
+        if not os.path.exists(self.detail_cache_path):
+            return
         try:
-            product = {}
-            
-            # Название
-            name_tag = card.find(['a', 'div', 'h3', 'h4'], class_=re.compile(r'name|title|header', re.I))
-            if not name_tag:
-                name_tag = card.find('a')
-            
-            if name_tag:
-                product['name'] = name_tag.get_text(strip=True)
-                if name_tag.name == 'a':
-                    product['url'] = urljoin(self.base_url, name_tag['href'])
-                elif name_tag.find('a'):
-                    product['url'] = urljoin(self.base_url, name_tag.find('a')['href'])
-            
-            if not product.get('name'):
-                return None
-
-            # Цена
-            price_tag = card.find(class_=re.compile(r'price|cost|sum', re.I))
-            if price_tag:
-                price_text = price_tag.get_text(strip=True)
-                price_match = re.search(r'(\d[\d\s]*[.,]?\d*)', price_text)
-                if price_match:
-                    product['price'] = price_match.group(1).replace(' ', '').replace('\xa0', '')
-            
-            # Картинка
-            img_tag = card.find('img')
-            if img_tag:
-                src = img_tag.get('src') or img_tag.get('data-src') or img_tag.get('data-original')
-                if src:
-                    product['image'] = urljoin(self.base_url, src)
-            
-            # Наличие
-            stock_tag = card.find(class_=re.compile(r'stock|availability', re.I))
-            if stock_tag:
-                product['in_stock'] = stock_tag.get_text(strip=True)
-            else:
-                product['in_stock'] = 'Уточняйте'
-
-            return product
+            with open(self.detail_cache_path, 'r', encoding='utf-8') as f:
+                self.detail_cache = json.load(f)
+            logger.info(f"🗂 Загружен кеш страниц товаров: {len(self.detail_cache)} записей")
         except Exception as e:
-            return None
+            logger.warning(f"⚠ Не удалось прочитать кеш {self.detail_cache_path}: {e}")
+            self.detail_cache = {}
 
-    def process_category(self, category_name, category_url):
-        """Обработка одной категории (пагинация + товары)"""
-        logger.info(f"📦 Обработка: {category_name}")
-        products = []
-        page = 1
-        
+    def save_detail_cache(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.detail_cache_path, 'w', encoding='utf-8') as f:
+            json.dump(self.detail_cache, f, ensure_ascii=False)
+
+    def schedule_pages(self, crawl):
+        """Постановка следующих страниц категории в очередь загрузки.
+
+        Адрес следующей страницы известен заранее, поэтому она качается, пока разбирается
+        текущая: допускается одна страница сверх подтвержденных разбором.
+        """
+        with self.pages_lock:
+            while (not crawl.done
+                   and crawl.next_page <= crawl.released + 2
+                   and crawl.next_page <= MAX_CATEGORY_PAGES):
+                self.pages_pending += 1
+                self.page_queue.put((crawl, crawl.next_page))
+                crawl.next_page += 1
+
+    def finish_page(self):
+        with self.pages_lock:
+            self.pages_pending -= 1
+            if not self.pages_pending:
+                self.pages_lock.notify_all()
+
+    def page_worker(self):
+        """Поток загрузки: берет страницы категорий из очереди, пока не получит None"""
         while True:
-            page_url = f"{category_url}?p={page}" if page > 1 else category_url
-            soup = self.get_soup(page_url)
-            
-            if not soup:
-                break
-                
-            # Поиск карточек товаров
-            product_cards = soup.find_all(class_=re.compile(r'product-item|catalog-item|item-card|products-grid__item', re.I))
-            
-            # Если не нашли по классам, ищем по структуре
-            if not product_cards:
-                potential_cards = soup.find_all('div')
-                product_cards = []
-                for div in potential_cards:
-                    if div.find('img') and div.find(string=re.compile(r'\d+\s*(?:руб|₽)')):
-                        product_cards.append(div)
-                        
-            if not product_cards:
-                if page == 1:
-                    logger.debug(f"  ⚠ Нет товаров в {category_name}")
-                break
-                
-            logger.info(f"  📄 Стр. {page}: найдено {len(product_cards)} товаров")
-            
-            new_products_count = 0
-            for card in product_cards:
-                product = self.parse_product_card(card)
-                if product and product.get('name'):
-                    product['category'] = category_name
-                    products.append(product)
-                    new_products_count += 1
-            
-            if new_products_count == 0:
-                break
-                
-            # Проверка пагинации
-            next_link = soup.find('a', class_=re.compile(r'next|forward'), href=True)
-            pagination = soup.find(class_=re.compile(r'pagination|pager'))
-            
-            if not next_link and not pagination:
-                break
-                
-            if page > 50:
-                break
-                
-            page += 1
+            task = self.page_queue.get()
+            if task is None:
+                return
+            crawl, page = task
+            try:
+                self.fetch_listing_page(crawl, page)
+            except Exception as e:
+                logger.error(f"  ❌ Ошибка в категории {crawl.name}: {e}")
+                self.handle_listing(crawl, page, ([], False))
+
+    def fetch_listing_page(self, crawl, page):
+        """Загрузка страницы категории и передача ее на разбор"""
+        if crawl.done:
+            # Страница была запрошена наперед, а категория уже закончилась
+            self.finish_page()
+            return
+
+        if page == 1:
+            logger.info(f"📦 Обработка: {crawl.name}")
+        else:
             time.sleep(0.5)
-            
-        return products
+
+        page_url = crawl.page_url(page)
+        response = self.fetch(page_url)
+
+        if response is None or response.status_code != 200:
+            # Предупреждение выводится, только если страница действительно была нужна,
+            # а не запрошена наперед за последней страницей категории
+            warning = None
+            if response is not None:
+                warning = f"⚠ Ошибка запроса {page_url}: Status {response.status_code}"
+            self.handle_listing(crawl, page, ([], False), warning)
+            return
+
+        self.parse_stage.submit(
+            'parse', parse_listing_page, response.content,
+            (response_encoding(response), self.base_url, crawl.name),
+            on_result=lambda result: self.handle_listing(crawl, page, result),
+            on_error=lambda error: self.listing_failed(crawl, page, error)
+        )
+
+    def listing_failed(self, crawl, page, error):
+        logger.error(f"  ❌ Ошибка в категории {crawl.name}, стр. {page}: {error}")
+        self.handle_listing(crawl, page, ([], False))
+
+    def handle_listing(self, crawl, page, result, warning=None):
+        """Результат разбора страницы категории (пагинация + товары)"""
+        released_products = []
+        with self.pages_lock:
+            if not crawl.done:
+                crawl.results[page] = (result, warning)
+
+            while not crawl.done and crawl.released + 1 in crawl.results:
+                current = crawl.released + 1
+                (page_products, has_next), warning = crawl.results.pop(current)
+                crawl.released = current
+
+                if warning:
+                    logger.warning(warning)
+
+                if page_products:
+                    logger.info(f"  📄 {crawl.name}, стр. {current}: найдено {len(page_products)} товаров")
+                    crawl.products.extend(page_products)
+                    released_products.extend(page_products)
+                elif current == 1:
+                    logger.debug(f"  ⚠ Нет товаров в {crawl.name}")
+
+                if not page_products or not has_next or current >= MAX_CATEGORY_PAGES:
+                    crawl.done = True
+                    crawl.results.clear()
+                    if crawl.products:
+                        logger.info(f"  ✅ {crawl.name}: собрано {len(crawl.products)} товаров")
+
+        # До finish_page: пока страница не закрыта, обход не считается завершенным
+        self.schedule_pages(crawl)
+        for product in released_products:
+            self.enqueue_detail(product)
+        self.finish_page()
+
+    def crawl_categories(self):
+        """Обход всех категорий: потоки загрузки + стадия разбора"""
+        crawls = [CategoryCrawl(name, url) for name, url in self.categories.items()]
+
+        threads = []
+        for _ in range(self.max_workers):
+            thread = threading.Thread(target=self.page_worker, daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        for crawl in crawls:
+            self.schedule_pages(crawl)
+
+        with self.pages_lock:
+            while self.pages_pending:
+                self.pages_lock.wait()
+
+        for _ in threads:
+            self.page_queue.put(None)
+        for thread in threads:
+            thread.join()
+
+        for crawl in crawls:
+            self.all_products.extend(crawl.products)
 
     def run(self):
-        """Основной цикл запуска"""
+        """Основной цикл запуска. Возвращает код завершения: 0 - товары собраны"""
         start_time = time.time()
         
         try:
@@ -258,28 +810,22 @@ class AquapolisOptimizedScraper:
             # 2. Сбор категорий
             if not self.parse_sitemap():
                 logger.error("Не удалось собрать категории. Завершение.")
-                return
-            
-            # 3. Парсинг категорий (параллельно)
-            logger.info(f"🚀 Начинаем парсинг {len(self.categories)} категорий в {self.max_workers} потока(ов)...")
-            
-            target_categories = list(self.categories.items())
+                return 1
             
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_cat = {
-                    executor.submit(self.process_category, name, url): name 
-                    for name, url in target_categories
-                }
-                
-                for future in concurrent.futures.as_completed(future_to_cat):
-                    cat_name = future_to_cat[future]
-                    try:
-                        cat_products = future.result()
-                        if cat_products:
-                            self.all_products.extend(cat_products)
-                            logger.info(f"  ✅ {cat_name}: собрано {len(cat_products)} товаров")
-                    except Exception as e:
-                        logger.error(f"  ❌ Ошибка в категории {cat_name}: {e}")
+            # 3. Парсинг категорий (конвейер: загрузка в потоках, разбор в процессах)
+            logger.info(
+                f"🚀 Начинаем парсинг {len(self.categories)} категорий: "
+                f"{self.max_workers} поток(ов) загрузки, {self.parse_workers} процесс(ов) разбора, "
+                f"очередь {self.parse_queue_size}"
+            )
+
+            self.parse_stage.start()
+            detail_threads = self.start_detail_workers() if self.fetch_details else []
+
+            self.crawl_categories()
+
+            if detail_threads:
+                self.stop_detail_workers(detail_threads)
 
             # 4. Сохранение результатов
             self.save_results()
@@ -287,12 +833,24 @@ class AquapolisOptimizedScraper:
         finally:
             if self.driver:
                 self.driver.quit()
+            self.parse_stage.stop()
                 
         duration = time.time() - start_time
         logger.info(f"🏁 Готово! Время выполнения: {duration:.2f} сек. Всего товаров: {len(self.all_products)}")
+        self.log_stage_stats(duration)
+
+        return 0 if self.all_products else 1
+
+    def log_stage_stats(self, duration):
+        """Пропускная способность по стадиям конвейера"""
+        logger.info("📈 Статистика по стадиям:")
+        for stats in self.stage_stats.values():
+            logger.info(f"  {stats.summary(duration)}")
 
     def save_results(self):
         """Сохранение в Excel и JSON"""
+        import pandas as pd
+
         if not self.all_products:
             logger.warning("Нет данных для сохранения.")
             return
@@ -300,12 +858,30 @@ class AquapolisOptimizedScraper:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-        # Excel
-        df = pd.DataFrame(self.all_products)
+        # Excel: колонки собираются прямо из записей, без промежуточных dict.
+        # Пустые во всех товарах поля (например, артикул без --details) не выводим.
+        columns = {}
+        for field in Product.__slots__:
+            values = [getattr(product, field) for product in self.all_products]
+            if any(value is not None for value in values):
+                columns[field] = values
+        df = pd.DataFrame(columns)
         excel_path = os.path.join(self.output_dir, 'aquapolis_full.xlsx')
         
+        # JSON (с характеристиками в исходном виде)
+        json_path = os.path.join(self.output_dir, 'aquapolis_full.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.all_products, f, ensure_ascii=False, indent=2, default=to_json)
+        logger.info(f"💾 Данные сохранены в {json_path}")
+
+        # Характеристики в Excel - одной строкой
+        if 'specs' in df.columns:
+            df['specs'] = df['specs'].apply(
+                lambda specs: '; '.join(f"{k}: {v}" for k, v in specs.items()) if isinstance(specs, dict) else specs
+            )
+
         # Упорядочиваем колонки
-        cols = ['name', 'price', 'in_stock', 'category', 'url', 'image']
+        cols = [c for c in ['name', 'article', 'price', 'in_stock', 'category', 'url', 'image', 'specs'] if c in df.columns]
         for c in df.columns:
             if c not in cols:
                 cols.append(c)
@@ -313,11 +889,13 @@ class AquapolisOptimizedScraper:
         # Переименование для красоты
         ru_cols = {
             'name': 'Название',
+            'article': 'Артикул',
             'price': 'Цена',
             'in_stock': 'Наличие',
             'category': 'Категория',
             'url': 'Ссылка',
-            'image': 'Изображение'
+            'image': 'Изображение',
+            'specs': 'Характеристики'
         }
         
         try:
@@ -344,5 +922,6 @@ if __name__ == "__main__":
         print("✅ Библиотеки установлены. Перезапустите скрипт.")
         exit()
 
+    setup_logging()
     scraper = AquapolisOptimizedScraper(headless=True, max_workers=5)
-    scraper.run()
\ No newline at end of file
+    sys.exit(scraper.run())
\ No newline at end of file
@@ -11,6 +11,9 @@ import os
 import re
 from pathlib import Path
 
+from paths import EXCEL_PATH, JSON_PATH
+from records import CatalogItem, to_json
+
 def is_category_header(row, ws):
     """Определяет, является ли строка заголовком категории"""
     # Категории обычно имеют заполненную только первую ячейку
@@ -106,14 +109,14 @@ def parse_catalog_excel(excel_path):
             price = clean_price(cell_c)
             
             # Создаем товар
-            item = {
-                "id": item_id,
-                "article": article,
-                "name": name,
-                "price": price,
-                "category": current_category or "Без категории",
-                "subcategory": current_subcategory or ""
-            }
+            item = CatalogItem(
+                item_id,
+                article,
+                name,
+                price,
+                current_category or "Без категории",
+                current_subcategory or ""
+            )
             
             catalog_data["items"].append(item)
             item_id += 1
@@ -134,7 +137,7 @@ def save_catalog_json(catalog_data, output_path):
     print(f"\n💾 Сохраняем в файл: {output_path}")
     
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(catalog_data, f, ensure_ascii=False, indent=2)
+        json.dump(catalog_data, f, ensure_ascii=False, indent=2, default=to_json)
     
     # Статистика файла
     file_size = os.path.getsize(output_path)
@@ -144,16 +147,12 @@ def save_catalog_json(catalog_data, output_path):
     print(f"   📊 Размер: {size_mb:.2f} MB")
     print(f"   📁 Путь: {output_path}")
 
-def main():
-    """Главная функция"""
+def main(excel_path=EXCEL_PATH, json_path=JSON_PATH):
+    """Главная функция. Возвращает данные каталога (None при ошибке)"""
     print("=" * 80)
     print("🔧 ИМПОРТ КАТАЛОГА ОБОРУДОВАНИЯ")
     print("=" * 80)
     
-    # Пути
-    excel_path = "PriceCatalogs/Каталог оборудования.xlsx"
-    json_path = "public/data/catalog.json"
-    
     # Проверяем существование Excel файла
     if not os.path.exists(excel_path):
         print(f"❌ Ошибка: файл {excel_path} не найден!")
@@ -173,8 +172,10 @@ def main():
         # Показываем примеры
         print("\n📋 Примеры товаров из каталога:")
         for i, item in enumerate(catalog_data["items"][:5], 1):
-            print(f"{i}. [{item['article']}] {item['name'][:60]}... - {item['price']:,.0f} ₽")
-            print(f"   Категория: {item['category']} / {item['subcategory']}")
+            print(f"{i}. [{item.article}] {item.name[:60]}... - {item.price:,.0f} ₽")
+            print(f"   Категория: {item.category} / {item.subcategory}")
+
+        return catalog_data
         
     except Exception as e:
         print(f"\n❌ Ошибка при импорте: {e}")
@@ -6,30 +6,40 @@
 
 import json
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import sys
 import time
 
-# Загружаем переменные окружения
-load_dotenv()
-
-# Настройки Supabase
-SUPABASE_URL = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
-SUPABASE_KEY = os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
+from paths import JSON_PATH
+from records import catalog_json_hook
 
 # Размер batch для импорта (не больше 1000 за раз)
 BATCH_SIZE = 100
 
-def main():
+def main(catalog_path=JSON_PATH, items=None):
+    """Импорт товаров в Supabase. Возвращает код завершения: 0 - все товары загружены.
+
+    Если items переданы (например, сразу после import_catalog), JSON не перечитывается.
+    """
+    # supabase и dotenv загружаются только при реальном импорте
+    from supabase import create_client, Client
+    from dotenv import load_dotenv
+
     print("=" * 80)
     print("🚀 ИМПОРТ КАТАЛОГА ОБОРУДОВАНИЯ В SUPABASE")
     print("=" * 80)
     
+    # Загружаем переменные окружения
+    load_dotenv()
+
+    # Настройки Supabase
+    SUPABASE_URL = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    SUPABASE_KEY = os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
+
     # Проверяем переменные окружения
     if not SUPABASE_URL or not SUPABASE_KEY:
         print("❌ Ошибка: NEXT_PUBLIC_SUPABASE_URL и NEXT_PUBLIC_SUPABASE_ANON_KEY должны быть установлены!")
         print("   Добавьте их в файл .env.local")
-        return
+        return 1
     
     print(f"\n📡 Подключение к Supabase...")
     print(f"   URL: {SUPABASE_URL}")
@@ -40,22 +50,23 @@ def main():
         print("✅ Подключение установлено")
     except Exception as e:
         print(f"❌ Ошибка подключения: {e}")
-        return
+        return 1
     
     # Загружаем JSON каталог
-    catalog_path = "public/data/catalog.json"
-    
-    if not os.path.exists(catalog_path):
-        print(f"❌ Файл {catalog_path} не найден!")
-        print("   Запустите сначала: python import_catalog.py")
-        return
-    
-    print(f"\n📖 Загружаем данные из {catalog_path}...")
-    
-    with open(catalog_path, 'r', encoding='utf-8') as f:
-        catalog_data = json.load(f)
-    
-    items = catalog_data.get('items', [])
+    if items is None:
+        if not os.path.exists(catalog_path):
+            print(f"❌ Файл {catalog_path} не найден!")
+            print("   Запустите сначала: python import_catalog.py")
+            return 1
+        
+        print(f"\n📖 Загружаем данные из {catalog_path}...")
+        
+        # Товары читаются сразу в CatalogItem, без промежуточных dict
+        with open(catalog_path, 'r', encoding='utf-8') as f:
+            catalog_data = json.load(f, object_hook=catalog_json_hook)
+        
+        items = catalog_data.get('items', [])
+
     total_items = len(items)
     
     print(f"✅ Загружено {total_items} товаров")
@@ -69,20 +80,6 @@ def main():
         print(f"⚠️  Предупреждение при очистке: {e}")
         print("   Возможно таблица пустая или не существует")
     
-    # Подготовка данных для импорта
-    print(f"\n📦 Подготовка данных для импорта...")
-    
-    equipment_items = []
-    for item in items:
-        equipment_item = {
-            'article': item['article'],
-            'name': item['name'],
-            'price': float(item['price']),
-            'category': item.get('category', ''),
-            'subcategory': item.get('subcategory', '')
-        }
-        equipment_items.append(equipment_item)
-    
     # Импортируем batch-ами
     print(f"\n⬆️  Импорт товаров в Supabase...")
     print(f"   Размер batch: {BATCH_SIZE}")
@@ -92,7 +89,8 @@ def main():
     failed_count = 0
     
     for i in range(0, total_items, BATCH_SIZE):
-        batch = equipment_items[i:i + BATCH_SIZE]
+        # Строки для Supabase собираются только для текущего batch
+        batch = [item.to_row() for item in items[i:i + BATCH_SIZE]]
         batch_num = (i // BATCH_SIZE) + 1
         
         print(f"\n   📤 Batch {batch_num}: {len(batch)} товаров...", end=' ')
@@ -128,7 +126,8 @@ def main():
     if failed_count > 0:
         print(f"❌ Не удалось импортировать: {failed_count} товаров")
     
-    print(f"\n📈 Процент успеха: {(imported_count / total_items * 100):.1f}%")
+    if total_items:
+        print(f"\n📈 Процент успеха: {(imported_count / total_items * 100):.1f}%")
     
     # Проверяем результат
     print(f"\n🔍 Проверка импорта...")
@@ -145,5 +144,7 @@ def main():
     print("\nТеперь вы можете использовать каталог в приложении!")
     print("Каталог доступен по адресу: /catalog")
 
+    return 1 if failed_count else 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
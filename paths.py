@@ -0,0 +1,12 @@
+"""
+Пути к файлам каталога по умолчанию
+
+Общие для read_catalog.py, import_catalog.py, import_to_supabase.py и CLI.
+Модуль без зависимостей, чтобы CLI мог использовать пути, не загружая openpyxl/supabase.
+"""
+
+# Исходный Excel каталог оборудования
+EXCEL_PATH = "PriceCatalogs/Каталог оборудования.xlsx"
+
+# JSON для приложения (результат import_catalog.py, источник для import_to_supabase.py)
+JSON_PATH = "public/data/catalog.json"
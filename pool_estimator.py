@@ -0,0 +1,242 @@
+"""
+Единая точка входа для инструментов каталога (pool-estimator)
+
+Подкоманды:
+    inspect  - структура Excel каталога (read_catalog.py)
+    import   - Excel -> public/data/catalog.json (import_catalog.py), с --sync сразу в Supabase
+    sync     - catalog.json -> Supabase (import_to_supabase.py)
+    scrape   - парсер aquapolis.ru (aquapolis_script.py)
+    bench    - замеры скорости разбора и памяти на записи
+
+Модули подкоманд и их зависимости (openpyxl, supabase, selenium, pandas...)
+импортируются только при вызове соответствующей подкоманды.
+
+Пример:
+    python pool_estimator.py import --sync
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+from paths import EXCEL_PATH, JSON_PATH
+
+
+def cmd_inspect(args):
+    import read_catalog
+
+    read_catalog.main(args.excel)
+
+
+def cmd_import(args):
+    import import_catalog
+
+    catalog_data = import_catalog.main(args.excel, args.output)
+    if catalog_data is None:
+        return 1
+
+    # Передаем уже разобранные товары, без повторного чтения JSON
+    if args.sync:
+        import import_to_supabase
+
+        return import_to_supabase.main(items=catalog_data['items'])
+
+
+def cmd_sync(args):
+    import import_to_supabase
+
+    return import_to_supabase.main(args.catalog)
+
+
+def cmd_scrape(args):
+    import aquapolis_script
+
+    aquapolis_script.setup_logging()
+    scraper = aquapolis_script.AquapolisOptimizedScraper(
+        headless=not args.visible,
+        max_workers=args.workers,
+        fetch_details=args.details,
+        detail_workers=args.detail_workers,
+        detail_queue_size=args.detail_queue,
+        parse_workers=args.parse_workers,
+        parse_queue_size=args.parse_queue,
+    )
+    return scraper.run()
+
+
+def bench_catalog(excel_path, repeat):
+    """Скорость разбора Excel каталога"""
+    import import_catalog
+
+    best = None
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # parse_catalog_excel печатает каждую категорию - в замер это не входит
+        with contextlib.redirect_stdout(io.StringIO()):
+            catalog_data = import_catalog.parse_catalog_excel(excel_path)
+        elapsed = time.perf_counter() - start
+        items = len(catalog_data['items'])
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"📖 Каталог: {items} товаров за {best:.2f} сек ({items / best:.0f} товаров/сек)")
+
+
+def bench_html(html_dir, repeat_count, parse_workers):
+    """Скорость разбора сохраненных страниц категорий: в потоке и в пуле процессов"""
+    import concurrent.futures
+    from itertools import repeat
+    import aquapolis_script
+
+    pages = []
+    for name in sorted(os.listdir(html_dir)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(html_dir, name), 'rb') as f:
+                pages.append(f.read())
+
+    if not pages:
+        print(f"⚠ В {html_dir} нет .html файлов")
+        return
+
+    def parse_all(map_func):
+        results = map_func(aquapolis_script.parse_listing_page, pages,
+                           repeat(None), repeat("https://aquapolis.ru"), repeat('bench'))
+        return sum(len(products) for products, _ in results)
+
+    print(f"🧮 Парсер: {aquapolis_script.HTML_PARSER}, страниц: {len(pages)}")
+
+    start = time.perf_counter()
+    for _ in range(repeat_count):
+        products = parse_all(map)
+    inline = (time.perf_counter() - start) / repeat_count
+    print(f"   В одном потоке: {len(pages) / inline:.1f} стр/сек ({products} товаров)")
+
+    workers = parse_workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        # Прогрев пула, чтобы не учитывать запуск процессов
+        list(pool.map(abs, range(workers)))
+        start = time.perf_counter()
+        for _ in range(repeat_count):
+            parse_all(pool.map)
+        pooled = (time.perf_counter() - start) / repeat_count
+    print(f"   Пул из {workers} процессов: {len(pages) / pooled:.1f} стр/сек (x{inline / pooled:.1f})")
+
+
+def _traced_size(build):
+    """Объем памяти (MB), который занимает результат build()"""
+    import tracemalloc
+
+    tracemalloc.start()
+    data = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return size / (1024 * 1024)
+
+
+def bench_memory(rows):
+    """Память на записи: dict против записей со __slots__"""
+    import json
+    from records import CatalogItem, Product, catalog_json_hook
+
+    categories = ['Насосы', 'Фильтры', 'Теплообменники', 'Химия для бассейна', 'Закладные детали']
+    print(f"🧠 Память на {rows} записей:")
+
+    # Каталог: чтение catalog.json, как в import_to_supabase.py
+    catalog_json = json.dumps({'items': [
+        CatalogItem(i, f"ART-{i}", f"Товар каталога №{i}", 1000.0 + i,
+                    categories[i % len(categories)], 'AM').to_dict()
+        for i in range(rows)
+    ]}, ensure_ascii=False)
+    as_dicts = _traced_size(lambda: json.loads(catalog_json))
+    as_records = _traced_size(lambda: json.loads(catalog_json, object_hook=catalog_json_hook))
+    print(f"   Каталог:  dict {as_dicts:.1f} MB -> CatalogItem {as_records:.1f} MB "
+          f"(-{(1 - as_records / as_dicts) * 100:.0f}%)")
+
+    # Парсер: категории приходят из пула процессов отдельными копиями строк
+    def scraped(make):
+        return [
+            make(f"Товар №{i}", f"https://aquapolis.ru/p{i}.html", str(1000 + i),
+                 'Уточняйте', categories[i % len(categories)].encode().decode())
+            for i in range(rows)
+        ]
+
+    as_dicts = _traced_size(lambda: scraped(
+        lambda name, url, price, stock, category:
+            {'name': name, 'url': url, 'price': price, 'in_stock': stock, 'category': category}
+    ))
+    as_records = _traced_size(lambda: scraped(
+        lambda name, url, price, stock, category:
+            Product(name, url=url, price=price, in_stock=stock, category=category)
+    ))
+    print(f"   Парсер:   dict {as_dicts:.1f} MB -> Product {as_records:.1f} MB "
+          f"(-{(1 - as_records / as_dicts) * 100:.0f}%)")
+
+
+def cmd_bench(args):
+    print("=" * 80)
+    print("⏱  ЗАМЕРЫ")
+    print("=" * 80)
+
+    if os.path.exists(args.excel):
+        bench_catalog(args.excel, args.repeat)
+    else:
+        print(f"⚠ Файл {args.excel} не найден, замер каталога пропущен")
+
+    if args.html:
+        bench_html(args.html, args.repeat, args.parse_workers)
+
+    if args.memory:
+        bench_memory(args.rows)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pool-estimator', description='Инструменты каталога оборудования')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('inspect', help='Структура Excel каталога')
+    p.add_argument('--excel', default=EXCEL_PATH)
+    p.set_defaults(func=cmd_inspect)
+
+    p = subparsers.add_parser('import', help='Импорт Excel каталога в JSON')
+    p.add_argument('--excel', default=EXCEL_PATH)
+    p.add_argument('--output', default=JSON_PATH)
+    p.add_argument('--sync', action='store_true', help='Сразу загрузить товары в Supabase')
+    p.set_defaults(func=cmd_import)
+
+    p = subparsers.add_parser('sync', help='Загрузка catalog.json в Supabase')
+    p.add_argument('--catalog', default=JSON_PATH)
+    p.set_defaults(func=cmd_sync)
+
+    p = subparsers.add_parser('scrape', help='Парсинг aquapolis.ru')
+    p.add_argument('--workers', type=int, default=5, help='Потоки загрузки страниц категорий')
+    p.add_argument('--parse-workers', type=int, default=None, help='Процессы разбора (0 - без пула)')
+    p.add_argument('--parse-queue', type=int, default=None, help='Максимум страниц в очереди на разбор')
+    p.add_argument('--details', action='store_true', help='Загружать страницы товаров (артикул, характеристики)')
+    p.add_argument('--detail-workers', type=int, default=4)
+    p.add_argument('--detail-queue', type=int, default=200)
+    p.add_argument('--visible', action='store_true', help='Запуск браузера не в headless режиме')
+    p.set_defaults(func=cmd_scrape)
+
+    p = subparsers.add_parser('bench', help='Замеры скорости разбора и памяти')
+    p.add_argument('--excel', default=EXCEL_PATH)
+    p.add_argument('--html', help='Папка с сохраненными страницами категорий')
+    p.add_argument('--parse-workers', type=int, default=None)
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--memory', action='store_true', help='Сравнить память dict и записей records.py')
+    p.add_argument('--rows', type=int, default=200000, help='Число записей для --memory')
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Компактные записи для каталога оборудования и товаров парсера
+
+Вместо dict на каждую строку используются классы со __slots__: у них нет
+словаря атрибутов, а повторяющиеся строки категорий интернируются (sys.intern),
+поэтому сотни тысяч записей занимают в разы меньше памяти.
+Записи передаются без копирования от разбора до JSON/Supabase.
+"""
+
+import sys
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class CatalogItem:
+    """Товар каталога оборудования (import_catalog.py -> catalog.json -> Supabase)"""
+
+    __slots__ = ('id', 'article', 'name', 'price', 'category', 'subcategory')
+
+    def __init__(self, id, article, name, price, category='', subcategory=''):
+        self.id = id
+        self.article = article
+        self.name = name
+        self.price = price
+        self.category = _intern(category)
+        self.subcategory = _intern(subcategory)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data.get('id'),
+            data['article'],
+            data['name'],
+            data.get('price', 0),
+            data.get('category', ''),
+            data.get('subcategory', '')
+        )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'article': self.article,
+            'name': self.name,
+            'price': self.price,
+            'category': self.category,
+            'subcategory': self.subcategory
+        }
+
+    def to_row(self):
+        """Строка для таблицы equipment_catalog (id назначает база)"""
+        return {
+            'article': self.article,
+            'name': self.name,
+            'price': float(self.price),
+            'category': self.category or '',
+            'subcategory': self.subcategory or ''
+        }
+
+    def __repr__(self):
+        return f"CatalogItem({self.article!r}, {self.name!r}, {self.price!r})"
+
+
+class Product:
+    """Товар, собранный парсером aquapolis.ru (карточка + страница товара)"""
+
+    __slots__ = ('name', 'url', 'price', 'image', 'in_stock', 'category', 'article', 'specs')
+
+    def __init__(self, name, url=None, price=None, image=None, in_stock=None,
+                 category=None, article=None, specs=None):
+        self.name = name
+        self.url = url
+        self.price = price
+        self.image = image
+        self.in_stock = _intern(in_stock)
+        self.category = _intern(category)
+        self.article = article
+        self.specs = specs
+
+    def update(self, details):
+        """Дополнение данными со страницы товара (article, specs)"""
+        for key, value in details.items():
+            if key in self.__slots__:
+                setattr(self, key, value)
+
+    def to_dict(self):
+        """Только заполненные поля, как в исходных dict-записях парсера"""
+        return {
+            slot: getattr(self, slot)
+            for slot in self.__slots__
+            if getattr(self, slot) is not None
+        }
+
+    # Передача между процессами пула разбора: кортеж значений вместо словаря,
+    # строки категорий интернируются заново в принимающем процессе
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+        self.category = _intern(self.category)
+        self.in_stock = _intern(self.in_stock)
+
+    def __repr__(self):
+        return f"Product({self.name!r}, price={self.price!r}, category={self.category!r})"
+
+
+def to_json(obj):
+    """Параметр default для json.dump: сериализация записей по одной, без копии списка"""
+    if isinstance(obj, (CatalogItem, Product)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def catalog_json_hook(data):
+    """object_hook для json.load: товары каталога сразу читаются в CatalogItem"""
+    if 'article' in data and 'name' in data:
+        return CatalogItem.from_dict(data)
+    return data